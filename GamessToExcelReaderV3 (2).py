@@ -1,51 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import mmap
+import os
 from pathlib import Path
+import json
 import re
+import sys
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
+try:
+    import re2  # optional linear-time engine, used when installed
+except ImportError:
+    re2 = None
 
-# === FUNCTIONS ===
+# === PATTERNS ===
 
-def extract_bond_length(text: str) -> float | None:
-    """Extract the first bond length from the INTERNUCLEAR DISTANCES section."""
-    match = re.search(
-        r"INTERNUCLEAR DISTANCES \(ANGS\.\).*?\n\s*\d+\s+[A-Z]+\s+([0-9]+\.\d+)\s+\*",
-        text,
-        re.DOTALL
-    )
-    return float(match.group(1)) if match else None
+def _compile(pattern: bytes):
+    """Compile with re2 when it's available and accepts the pattern, otherwise with re."""
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
 
-def extract_heat_of_formation(text: str) -> float | None:
-    """Extract the heat of formation from the DENSITY CONVERGED section."""
-    match = re.search(r"HEAT OF FORMATION IS\s+(-?\d+\.\d+)", text)
-    return float(match.group(1)) if match else None
+# patterns are bytes so they can run straight over the memory-mapped log
+_BOND_HEADER = b"INTERNUCLEAR DISTANCES (ANGS.)"
+_BOND_WINDOW = 4096  # the first bonded row sits a few lines below the header
+_BOND_RE = _compile(rb"\n\s*\d+\s+[A-Z]+\s+([0-9]+\.\d+)\s+\*")
+# "LABEL [=] value" fields are found with plain find/rfind, no regex needed
+_HOF_LABEL = b"HEAT OF FORMATION IS"
+_TE_LABEL = b"TOTAL ENERGY"
+_TIME_LABEL = b"TOTAL WALL CLOCK TIME="
+_DONE_MARKER = b"EXECUTION OF GAMESS TERMINATED NORMALLY"
+_INPUT_RE = _compile(rb"(?m)INPUT CARD>!\s*(.*?)\s*\|\s*.*?\|\s*(.*?)\s*$")
+
+# === COLUMNS ===
 
-def extract_total_energy(text:str) -> float |None:
-    """Extract the total energy from the ENERGY COMPONENTS section"""
-    match = re.search(r'TOTAL ENERGY\s+=\s+(-?\d+\.\d+)',text)
+COLS = ("molecule", "force_field", "basis", "comp_method",
+        "bond_length (Å)", "heat_of_formation (kcal/mol)",
+        "Total Energy (Hartrees)", "Run_Time (s)", "Completion")
+NUM_COLS = list(COLS[4:8])
+
+# === FUNCTIONS ===
+
+def extract_bond_length(text: bytes) -> float | None:
+    """Extract the first bond length from the INTERNUCLEAR DISTANCES section."""
+    idx = text.find(_BOND_HEADER)
+    if idx < 0:
+        return None
+    match = _BOND_RE.search(text, idx, idx + _BOND_WINDOW)
     return float(match.group(1)) if match else None
 
 def parse_filename(file: Path):
     """Split filename into molecule, force field, basis set, and computational method."""
-    try:
-        parts = file.stem.split('_')
-        molecule, forcefield, basis, comp = parts
-        return molecule, forcefield, basis, comp
-    except ValueError:
+    # anything past the third underscore belongs to the comp method
+    parts = file.stem.split('_', 3)
+    if len(parts) != 4:
         return None, None, None, None
+    return parts[0], parts[1], parts[2], parts[3]
 
-def run_time(text:str)-> str | None:
-    matches = re.findall(r'TOTAL WALL CLOCK TIME=\s+([0-9]+\.\d+)',text)
-    return matches[-1] if matches else None
+def _decimal_prefix(token: bytes, signed: bool) -> bytes | None:
+    r"""Return the leading '-?\d+\.\d+' part of token (no '-' unless signed), or None."""
+    sign = 1 if signed and token.startswith(b"-") else 0
+    whole, dot, rest = token[sign:].partition(b".")
+    if not dot or not whole.isdigit():
+        return None
+    digits = 0
+    while rest[digits:digits + 1].isdigit():
+        digits += 1
+    if not digits:
+        return None
+    return token[:sign + len(whole) + 1 + digits]
 
-def fallback_parse_input_section(text: str):
+def _field_value(text: bytes, pos: int, label: bytes, sep: bytes | None, signed: bool) -> float | None:
+    """Parse the number that follows the label found at pos, skipping sep if given."""
+    start = pos + len(label)
+    end = text.find(b"\n", start)
+    line = text[start:end if end >= 0 else len(text)]
+    # the label must be followed by whitespace, as must sep
+    if not line[:1].isspace():
+        return None
+    tokens = line.split()
+    if sep is not None:
+        if not tokens or tokens[0] != sep:
+            return None
+        tokens = tokens[1:]
+    number = _decimal_prefix(tokens[0], signed) if tokens else None
+    return float(number) if number is not None else None
+
+def _first_value(text: bytes, label: bytes, sep: bytes | None = None, signed: bool = True) -> float | None:
+    pos = text.find(label)
+    while pos >= 0:
+        value = _field_value(text, pos, label, sep, signed)
+        if value is not None:
+            return value
+        pos = text.find(label, pos + 1)
+    return None
+
+def _last_value(text: bytes, label: bytes, sep: bytes | None = None, signed: bool = True) -> float | None:
+    pos = text.rfind(label)
+    while pos >= 0:
+        value = _field_value(text, pos, label, sep, signed)
+        if value is not None:
+            return value
+        pos = text.rfind(label, 0, pos)
+    return None
+
+def extract_scalars(text: bytes):
+    """Extract heat of formation, total energy, last wall clock time and completion."""
+    heat = _first_value(text, _HOF_LABEL)
+    energy = _first_value(text, _TE_LABEL, b"=")
+    time = _last_value(text, _TIME_LABEL, signed=False)
+    # the marker is the last line of a finished run, so search from the end
+    completed = text.rfind(_DONE_MARKER) >= 0
+    return heat, energy, time, completed
+
+def fallback_parse_input_section(text: bytes):
     """Extract molecule, comp method, and basis from the input section."""
     try:
-        match = re.search(r"INPUT CARD>!\s*(.*?)\s*\|\s*.*?\|\s*(.*?)\s*$", text, re.MULTILINE)
+        match = _INPUT_RE.search(text)
         if not match:
             return None, None, None, None
-        molecule = match.group(1).strip()
-        method_basis = match.group(2).strip()
+        molecule = match.group(1).decode('utf-8', errors='ignore').strip()
+        method_basis = match.group(2).decode('utf-8', errors='ignore').strip()
         if '/' in method_basis:
             method, basis = method_basis.split('/', 1)
         else:
@@ -54,104 +131,149 @@ def fallback_parse_input_section(text: str):
     except Exception:
         return None, None, None, None
 
+def scan_log(file: Path, with_input: bool = False):
+    """Memory-map a log and pull out every field without copying it into a str.
 
-# === PATHS ===
-
-input_path = Path(r'C:\Users\Public\gamess-64\outputs')
-output_path = Path(r'C:\Users\Public\gamess-64\saved outputs\Python compiled csv')
-output_path.mkdir(parents=True, exist_ok=True)
-excel_file = output_path / 'Gamess_summary.xlsx'
-
-
+    Returns the INPUT CARD fields (only when with_input is set) along with the
+    bond length, heat of formation, total energy, run time and completion flag.
+    """
+    with file.open('rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:  # mmap refuses empty files
+            mapped = nullcontext(b"")
+        else:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # on a cold cache, ask the kernel to start reading the whole file
+            # in the background while we scan (not available on Windows)
+            if hasattr(mmap, 'MADV_WILLNEED'):
+                mapped.madvise(mmap.MADV_WILLNEED)
+        with mapped as buf:
+            card = fallback_parse_input_section(buf) if with_input else None
+            bond = extract_bond_length(buf)
+            heat, energy, time, completed = extract_scalars(buf)
+    return card, bond, heat, energy, time, completed
 
-# === MAIN LOOP ===
 
-results = []
+def process_log(file: Path) -> tuple[tuple | None, str | None]:
+    """Parse a single log into one summary row (or None) and a message for the console.
 
-for file in input_path.glob('*.log'):
-    if file.name.lower() == 'readme.txt':
-        print(f"Skipping {file.name}")
-        continue
-    
+    Workers don't print; the main process writes all messages in one go at the end.
+    """
     try:
-        
-        
-        with file.open(encoding='utf-8', errors='ignore') as f:
-            contents = f.read()
-        #fallback if you didn't name the files like me
         molecule, ff, basis, method = parse_filename(file)
-        if None in (molecule,ff,basis, method):
-            molecule,ff,basis,method = fallback_parse_input_section(contents)
+        #fallback if you didn't name the files like me
+        need_card = None in (molecule,ff,basis, method)
+        card, bond, heat, energy, time, completed = scan_log(file, need_card)
+        if need_card:
+            molecule,ff,basis,method = card
         
-        bond = extract_bond_length(contents)
-        heat = extract_heat_of_formation(contents)
-        energy = extract_total_energy(contents)        
-        time = run_time(contents)
         #check if failed
-        if "EXECUTION OF GAMESS TERMINATED NORMALLY" not in contents:
-            results.append({
-               "molecule": molecule,
-                "force_field": ff,
-                "basis": basis,
-                "comp_method": method,
-                "bond_length (Å)": bond if bond is not None else 'NA',
-                "heat_of_formation (kcal/mol)": heat if heat is not None else 'NA',
-                "Total Energy (Hartrees)": energy if energy is not None else "NA",
-                "Run_Time (s)": time if time is not None else "NA",
-                "Completion": (f"Incomplete")
-                })
-            continue
-       
-        
+        if not completed:
+            return (molecule, ff, basis, method, bond, heat, energy, time, "Incomplete"), None
 
         #else we continue to a succesful compile
         if any(v is not None for v in [bond,heat,energy]):
-            results.append({
-                "molecule": molecule,
-                "force_field": ff,
-                "basis": basis,
-                "comp_method": method,
-                "bond_length (Å)": bond if bond is not None else 'NA',
-                "heat_of_formation (kcal/mol)": heat if heat is not None else 'NA',
-                "Total Energy (Hartrees)": energy if energy is not None else "NA",
-                "Run_Time (s)": time if time is not None else "NA",
-                "Completion": (f"Completed")
-            })
-        
-        
-        else:
-            print(f'Failed Entirely')
+            return (molecule, ff, basis, method, bond, heat, energy, time, "Completed"), None
+
+        return None, f'Failed Entirely: {file.name}'
     except Exception as e:
-        print (f'error processing{file.name}')
-# === EXPORT ===
-df = pd.DataFrame(results)
-df.to_excel(excel_file, index = False)
+        return None, f'error processing {file.name}: {e}'
+
+# bump whenever the row layout changes so old caches are thrown away
+_CACHE_VERSION = 4
+
+def load_cache(cache_file: Path) -> dict:
+    """Load the (path, mtime, size) -> row cache from a previous run, or start empty.
+
+    The cache is plain JSON so a file dropped in the shared output folder is only
+    ever read as data; anything that doesn't look like our own cache is ignored.
+    """
+    try:
+        with cache_file.open(encoding='utf-8') as f:
+            data = json.load(f)
+        if data['version'] != _CACHE_VERSION:
+            return {}
+        rows = {}
+        for (path, mtime_ns, size), row in data['entries']:
+            if len(row) != len(COLS) or not all(v is None or isinstance(v, (str, int, float)) for v in row):
+                return {}
+            rows[(str(path), int(mtime_ns), int(size))] = tuple(row)
+        return rows
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def save_cache(cache_file: Path, rows: dict):
+    """Write the cache to a temp file and swap it in, so an interrupted run can't truncate it."""
+    data = {'version': _CACHE_VERSION, 'entries': [[list(key), list(row)] for key, row in rows.items()]}
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    with tmp_file.open('w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, cache_file)
+
+
+if __name__ == '__main__':
+
+    # === PATHS ===
+
+    input_path = Path(r'C:\Users\Public\gamess-64\outputs')
+    output_path = Path(r'C:\Users\Public\gamess-64\saved outputs\Python compiled csv')
+    output_path.mkdir(parents=True, exist_ok=True)
+    excel_file = output_path / 'Gamess_summary.xlsx'
+    cache_file = output_path / 'Gamess_summary.cache.json'
+
+
+
+    # === MAIN LOOP ===
 
-wb = load_workbook(excel_file)
-ws = wb.active
+    # scandir hands back cached stat info, so the cache keys below are nearly free
+    with os.scandir(input_path) as it:
+        entries = [e for e in it if e.is_file() and e.name.lower().endswith('.log')]
+    files = [Path(e.path) for e in entries]
 
-#THis is all to make the "completion" results either red or green
-#df.to_csv(output_file, index=False, encoding='utf-8-sig')
-completion_col = None
-for idx, cell in enumerate(ws[1], 1):  # row 1, 1-based indexing
-    if cell.value == "Completion":
-                completion_col = idx
-                break
+    # logs that haven't changed since the last run come straight from the cache
+    cache = load_cache(cache_file)
+    keys = []
+    for entry in entries:
+        st = entry.stat()
+        keys.append((entry.path, st.st_mtime_ns, st.st_size))
+    stale = [(file, key) for file, key in zip(files, keys) if key not in cache]
 
-        # Define fills
-green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+    # each log is independent, so parse them across all cores
+    log_lines: list[str] = []
+    if stale:
+        with ProcessPoolExecutor() as ex:
+            parsed = ex.map(process_log, [file for file, _ in stale], chunksize=8)
+            for (_, key), (row, note) in zip(stale, parsed):
+                if row is not None:  # failures are retried next run
+                    cache[key] = row
+                if note is not None:
+                    log_lines.append(note)
+    if log_lines:
+        sys.stdout.write("\n".join(log_lines) + "\n")
 
-        # Apply fill based on value
-for row in range(2, ws.max_row + 1):  # skip header row
-    cell = ws.cell(row=row, column=completion_col)
-    if cell.value == "Completed":
-        cell.fill = green_fill
-    elif cell.value == "Incomplete":
-        cell.fill = red_fill
+    results = [cache[key] for key in keys if key in cache]
+    save_cache(cache_file, {key: cache[key] for key in keys if key in cache})
 
+    # === EXPORT ===
+    # build column by column so each numeric column is a single float64 array;
+    # missing values stay NaN there and only become 'NA' on export
+    columns = list(zip(*results)) or [()] * len(COLS)
+    df = pd.DataFrame({
+        name: pd.Series(values, dtype='float64') if name in NUM_COLS else pd.Series(values, dtype=object)
+        for name, values in zip(COLS, columns)
+    })
 
+    with pd.ExcelWriter(excel_file, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index = False, na_rep='NA')
+        ws = writer.sheets['Sheet1']
 
-wb.save(excel_file)
+        #THis is all to make the "completion" results either red or green
+        #df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        green_fill = writer.book.add_format({'bg_color': '#C6EFCE'})
+        red_fill = writer.book.add_format({'bg_color': '#FFC7CE'})
+        # one rule per colour instead of filling every cell by hand
+        if not df.empty:  # nothing to colour when no log was usable
+            col = df.columns.get_loc("Completion")
+            ws.conditional_format(1, col, len(df), col, {'type': 'cell', 'criteria': '==', 'value': '"Completed"', 'format': green_fill})
+            ws.conditional_format(1, col, len(df), col, {'type': 'cell', 'criteria': '==', 'value': '"Incomplete"', 'format': red_fill})
 
-print(f"\n✅ XLSX saved to:\n{excel_file}")
+    print(f"\n✅ XLSX saved to:\n{excel_file}")